@@ -1,22 +1,50 @@
+import functools
 import pint
 from mcp.server.fastmcp import FastMCP
 
 mcp = FastMCP("conversions")
-ureg = pint.UnitRegistry()
+# Let pint persist its parsed definitions between runs; each MCP server is a
+# fresh subprocess, so otherwise every launch re-reads the definition files.
+ureg = pint.UnitRegistry(cache_folder=":auto:")
+
+# Unit strings like "kg", "g" or "m/s^2" repeat across tool calls, so keep the
+# parsed results around instead of re-tokenizing them every time.
+@functools.lru_cache(maxsize=512)
+def _parse_unit(unit_str: str):
+    return ureg(unit_str)
+
+@functools.lru_cache(maxsize=512)
+def _parse_expr(expr: str):
+    return ureg.parse_expression(expr)
+
+# Conversion factors for (from_unit, to_unit) pairs, so a repeat conversion is
+# a single float multiply instead of a Quantity.to() dimensional analysis.
+@functools.lru_cache(maxsize=512)
+def _factor(from_unit: str, to_unit: str) -> float:
+    return (1.0 * _parse_unit(from_unit)).to(_parse_unit(to_unit).units).magnitude
+
+def _convert(value: float, from_unit: str, to_unit: str) -> float:
+    from_qty, to_qty = _parse_unit(from_unit), _parse_unit(to_unit)
+    # Offset units (degC, degF) are affine, so a fixed factor would be wrong
+    if from_qty._is_multiplicative and to_qty._is_multiplicative:
+        return value * _factor(from_unit, to_unit)
+    return (value * from_qty).to(to_qty.units).magnitude
+
+# kg × m/s² is already in base units, so smart_force can skip to_base_units()
+FORCE_BASE_UNITS = f"{(ureg.kilogram * ureg.meter / ureg.second**2):~}"
 
 @mcp.tool(description="Convert a value with units to another unit. Example: 100 grams to kilograms, or 15 cm to meters.")
 async def convert_units(value: float, from_unit: str, to_unit: str) -> str:
     try:
-        qty = value * ureg(from_unit)
-        converted = qty.to(to_unit)
-        return f"{value} {from_unit} = {converted.magnitude:.6g} {to_unit}"
+        converted = _convert(value, from_unit, to_unit)
+        return f"{value} {from_unit} = {converted:.6g} {to_unit}"
     except Exception as e:
         return f"Error: {e}"
 
 @mcp.tool(description="Simplify or break down a unit into base SI units (e.g., N to kg·m/s^2).")
 async def simplify_unit(unit_expr: str) -> str:
     try:
-        unit = ureg(unit_expr)
+        unit = _parse_unit(unit_expr)
         base = unit.to_base_units()
         return f"{unit_expr} = {base:~}"
     except Exception as e:
@@ -25,19 +53,18 @@ async def simplify_unit(unit_expr: str) -> str:
 @mcp.tool(description="Smart physics conversion: e.g., if you want force from mass in grams and acceleration in m/s², will handle conversions and calculate the result.")
 async def smart_force(mass_value: float, mass_unit: str, accel_value: float, accel_unit: str = "meter/second**2") -> str:
     try:
-        mass = (mass_value * ureg(mass_unit)).to("kilogram")
-        accel = (accel_value * ureg(accel_unit)).to("meter/second**2")
+        mass = _convert(mass_value, mass_unit, "kilogram")
+        accel = _convert(accel_value, accel_unit, "meter/second**2")
         force = mass * accel
         # Also show in base units
-        base = force.to_base_units()
-        return f"Force = {mass.magnitude:.4g} kg × {accel.magnitude:.4g} m/s² = {force.magnitude:.4g} N\n(Simplified: {base:~})"
+        return f"Force = {mass:.4g} kg × {accel:.4g} m/s² = {force:.4g} N\n(Simplified: {force} {FORCE_BASE_UNITS})"
     except Exception as e:
         return f"Error: {e}"
 
 @mcp.tool(description="Cancel or simplify units in an expression, e.g., simplify (kg*m/s^2)/(N) or (g/cm^3) to SI units.")
 async def simplify_expression(expr: str) -> str:
     try:
-        qty = ureg.parse_expression(expr)
+        qty = _parse_expr(expr)
         base = qty.to_base_units()
         return f"{expr} = {base:~}"
     except Exception as e:
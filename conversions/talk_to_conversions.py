@@ -1,18 +1,71 @@
 #!/usr/bin/env python3
+import argparse
 import asyncio
 import json
-import requests
+import re
+import aiohttp
+import orjson
 from contextlib import AsyncExitStack
+from aioconsole import ainput
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+# TOOL/ARGS header in the LLM output. ARGS is decoded from the "{" after it with
+# raw_decode, so it may span lines and nest objects.
+_TOOL_RE = re.compile(r"TOOL:\s*(\S+)\s*\nARGS:\s*(?=\{)")
+_ARGS_DECODER = json.JSONDecoder()
+
+SYSTEM_PROMPT = """
+You are a smart physics and units conversion assistant. 
+- If the user gives values in the "wrong" units for a calculation (e.g., mass in grams for F = m·a), automatically convert and explain.
+- You know that 1 N = 1 kg·m/s², and you can simplify and break down units.
+- You have these tools:
+1. convert_units(value, from_unit, to_unit): converts between units (e.g., grams to kg, cm to m, Pa to N/m^2).
+2. simplify_unit(unit_expr): writes a unit as SI base units (e.g., N as kg·m/s²).
+3. smart_force(mass_value, mass_unit, accel_value, accel_unit): computes force, converting units if needed.
+4. simplify_expression(expr): simplifies compound unit expressions.
+
+Always extract needed numbers and units from the user's question, fill in the tool arguments, and respond in clear, natural English.
+
+Examples:
+TOOL: convert_units
+ARGS: {"value": 1500, "from_unit": "g", "to_unit": "kg"}
+
+TOOL: smart_force
+ARGS: {"mass_value": 300, "mass_unit": "g", "accel_value": 2.5, "accel_unit": "m/s^2"}
+
+TOOL: simplify_unit
+ARGS: {"unit_expr": "N"}
+
+TOOL: simplify_expression
+ARGS: {"expr": "(kg*m/s^2)/(N)"}
+"""
+SYSTEM_PROMPT_JSON = orjson.dumps(SYSTEM_PROMPT)
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 class OllamaMCPClient:
     def __init__(self, ollama_model="llama3.2", ollama_host="http://localhost:11434"):
         self.ollama_model = ollama_model
         self.ollama_host = ollama_host
+        self.request_prefix = b'{"model":' + orjson.dumps(ollama_model) + b',"stream":true'
         self.mcp_session = None
+        self.http_session = None
         self.exit_stack = AsyncExitStack()
 
+    def open_http_session(self):
+        self.http_session = aiohttp.ClientSession(
+            base_url=self.ollama_host,
+            connector=aiohttp.TCPConnector(limit=16, keepalive_timeout=60)
+        )
+
+    async def warm_up_ollama(self):
+        # A generate request without a prompt just loads the model into memory
+        try:
+            async with self.http_session.post("/api/generate", json={"model": self.ollama_model}) as response:
+                await response.read()
+        except aiohttp.ClientError as e:
+            print(f"[Ollama Error] Could not preload model: {e}")
+
     async def connect_to_server(self, server_script_path: str, cwd: str):
         command = "uv" if server_script_path.endswith(".py") else "node"
         args = ["run", server_script_path] if command == "uv" else [server_script_path]
@@ -30,21 +83,35 @@ class OllamaMCPClient:
         for tool in tools.tools:
             print(f"  • {tool.name}: {tool.description}")
 
-    async def call_ollama(self, prompt, system_prompt=None):
-        def _make_request():
-            url = f"{self.ollama_host}/api/generate"
-            data = {
-                "model": self.ollama_model,
-                "prompt": prompt,
-                "stream": False
-            }
-            if system_prompt:
-                data["system"] = system_prompt
-            response = requests.post(url, json=data)
-            if response.status_code == 200:
-                return response.json()["response"]
-            return f"[Ollama Error] Status code {response.status_code}"
-        return await asyncio.to_thread(_make_request)
+    async def call_ollama(self, prompt, system_json=None, on_text=None):
+        # system_json is the system prompt already encoded as a JSON string
+        # (e.g. SYSTEM_PROMPT_JSON), so only the user prompt is encoded per call
+        body = [self.request_prefix]
+        if system_json:
+            body += [b',"system":', system_json]
+        body += [b',"prompt":', orjson.dumps(prompt), b"}"]
+        async with self.http_session.post("/api/generate", data=b"".join(body), headers=JSON_HEADERS) as response:
+            if response.status != 200:
+                return f"[Ollama Error] Status code {response.status}"
+            # Ollama streams NDJSON chunks; show on_text the answer so far each time
+            # a line completes, while the rest is still being generated.
+            parts = []
+            async for chunk in response.content:
+                if not chunk.strip():
+                    continue
+                token = orjson.loads(chunk).get("response", "")
+                parts.append(token)
+                if on_text and "\n" in token:
+                    on_text("".join(parts))
+            text = "".join(parts)
+            if on_text:
+                on_text(text)
+            return text
+
+    async def aclose(self):
+        if self.http_session:
+            await self.http_session.close()
+            self.http_session = None
 
     async def call_mcp_tool(self, tool_name, args):
         if not self.mcp_session:
@@ -58,50 +125,35 @@ class OllamaMCPClient:
     async def process_conversion_request(self, user_query):
         print(f"📥 User query: {user_query}")
 
-        system_prompt = """
-You are a smart physics and units conversion assistant. 
-- If the user gives values in the "wrong" units for a calculation (e.g., mass in grams for F = m·a), automatically convert and explain.
-- You know that 1 N = 1 kg·m/s², and you can simplify and break down units.
-- You have these tools:
-1. convert_units(value, from_unit, to_unit): converts between units (e.g., grams to kg, cm to m, Pa to N/m^2).
-2. simplify_unit(unit_expr): writes a unit as SI base units (e.g., N as kg·m/s²).
-3. smart_force(mass_value, mass_unit, accel_value, accel_unit): computes force, converting units if needed.
-4. simplify_expression(expr): simplifies compound unit expressions.
-
-Always extract needed numbers and units from the user's question, fill in the tool arguments, and respond in clear, natural English.
+        tool_task, parse_error = None, False
 
-Examples:
-TOOL: convert_units
-ARGS: {"value": 1500, "from_unit": "g", "to_unit": "kg"}
-
-TOOL: smart_force
-ARGS: {"mass_value": 300, "mass_unit": "g", "accel_value": 2.5, "accel_unit": "m/s^2"}
-
-TOOL: simplify_unit
-ARGS: {"unit_expr": "N"}
-
-TOOL: simplify_expression
-ARGS: {"expr": "(kg*m/s^2)/(N)"}
-"""
-
-        llm_response = await self.call_ollama(user_query, system_prompt)
+        def on_text(text):
+            nonlocal tool_task, parse_error
+            if tool_task:
+                return
+            match = _TOOL_RE.search(text)
+            if not match:
+                return
+            try:
+                args, _ = _ARGS_DECODER.raw_decode(text, match.end())
+            except json.JSONDecodeError:
+                parse_error = True
+                return
+            if args:
+                # Start the tool right away instead of waiting for the LLM to finish.
+                tool_name = match.group(1)
+                print(f"🔧 Calling MCP tool: {tool_name} with args {args}")
+                tool_task = asyncio.create_task(self.call_mcp_tool(tool_name, args))
+
+        llm_response = await self.call_ollama(user_query, SYSTEM_PROMPT_JSON, on_text=on_text)
         print(f"🧠 LLM suggested:\n{llm_response}")
 
-        tool_name, args = None, {}
-        for line in llm_response.splitlines():
-            if line.startswith("TOOL:"):
-                tool_name = line.split("TOOL:")[1].strip()
-            elif line.startswith("ARGS:"):
-                try:
-                    args = json.loads(line.split("ARGS:")[1].strip())
-                except json.JSONDecodeError:
-                    return "[Parse Error] Could not decode ARGS."
-
-        if not tool_name or not args:
+        if not tool_task:
+            if parse_error:
+                return "[Parse Error] Could not decode ARGS."
             return "[Error] Could not parse tool or arguments."
 
-        print(f"🔧 Calling MCP tool: {tool_name} with args {args}")
-        mcp_result = await self.call_mcp_tool(tool_name, args)
+        mcp_result = await tool_task
         print(f"📦 MCP returned:\n{mcp_result}")
 
         final_prompt = f"""User asked: {user_query}
@@ -113,26 +165,79 @@ Respond naturally, explain any automatic conversions, simplifications, or SI rel
         final_response = await self.call_ollama(final_prompt)
         return final_response
 
-    async def chat_loop(self):
-        print("🤖 Conversions Assistant ready. Type 'quit' to exit.\n")
-        await self.connect_to_server("conversions.py", cwd="/Users/jakubpierog/Documents/newton_forces_mcp/conversions")
-
+    async def drain_queue(self, queue: asyncio.Queue, batch_size: int = 4):
+        """Answer queued user queries, up to batch_size at a time concurrently.
+        A None item stops the worker once the queue has been emptied."""
+        stopping = False
         while True:
-            user_input = input("🔄 Ask any unit, physics, or simplification question: ").strip()
-            if user_input.lower() in ("quit", "exit", "q"):
-                print("👋 Exiting. Stay curious about units!")
+            batch = [await queue.get()]
+            while len(batch) < batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            responses = await asyncio.gather(
+                *(self.process_conversion_request(query) for query in batch if query),
+                return_exceptions=True
+            )
+            for response in responses:
+                if isinstance(response, Exception):
+                    print(f"[Error] {response}")
+                else:
+                    print(f"\n🗣️ Assistant: {response}\n")
+            for _ in batch:
+                queue.task_done()
+            stopping = stopping or None in batch
+            if stopping and queue.empty():
                 break
-            if not user_input:
-                continue
-            try:
-                response = await self.process_conversion_request(user_input)
-                print(f"\n🗣️ Assistant: {response}\n")
-            except Exception as e:
-                print(f"[Error] {e}")
 
-async def main():
+    async def chat_loop(self, queue: asyncio.Queue | None = None):
+        print("🤖 Conversions Assistant ready. Type 'quit' to exit.\n")
+        try:
+            # Spawn the MCP server and load the Ollama model at the same time
+            self.open_http_session()
+            await asyncio.gather(
+                self.connect_to_server("conversions.py", cwd="/Users/jakubpierog/Documents/newton_forces_mcp/conversions"),
+                self.warm_up_ollama()
+            )
+
+            if queue is not None:
+                await self.drain_queue(queue)
+                return
+
+            while True:
+                user_input = (await ainput("🔄 Ask any unit, physics, or simplification question: ")).strip()
+                if user_input.lower() in ("quit", "exit", "q"):
+                    print("👋 Exiting. Stay curious about units!")
+                    break
+                if not user_input:
+                    continue
+                try:
+                    response = await self.process_conversion_request(user_input)
+                    print(f"\n🗣️ Assistant: {response}\n")
+                except Exception as e:
+                    print(f"[Error] {e}")
+        finally:
+            await self.aclose()
+
+async def main(batch=None):
     client = OllamaMCPClient()
-    await client.chat_loop()
+    if batch is None:
+        await client.chat_loop()
+        return
+    # `uv run talk_to_conversions.py --batch queries.txt`: one query per line, answered concurrently
+    queue = asyncio.Queue()
+    with batch:
+        for line in batch:
+            if line.strip():
+                queue.put_nowait(line.strip())
+    queue.put_nowait(None)
+    await client.chat_loop(queue)
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--batch", metavar="FILE", type=argparse.FileType("r", encoding="utf-8"),
+        help="answer every line of FILE ('-' for stdin) as a query, then exit"
+    )
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(parse_args().batch))
@@ -1,80 +1,121 @@
+import functools
+import itertools
 import math
 import sympy as sp
 import pint
-import svgwrite
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+from xml.sax.saxutils import escape
 from mcp.server.fastmcp import FastMCP
 
 mcp = FastMCP("diagram")
-ureg = pint.UnitRegistry()
+# Let pint persist its parsed definitions between runs; each MCP server is a
+# fresh subprocess, so otherwise every launch re-reads the definition files.
+ureg = pint.UnitRegistry(cache_folder=":auto:")
 
-def parse_vector(vec: Any) -> List[float]:
+def _xy_to_polar(x: float, y: float) -> Tuple[float, float]:
+    mag = math.hypot(x, y)
+    angle = (math.degrees(math.atan2(y, x)) + 360) % 360
+    return mag, angle
+
+@functools.lru_cache(maxsize=1024)
+def _sympify_float(s: str) -> float:
+    # Most forces are plain numbers, which don't need sympy at all
+    try:
+        return float(s)
+    except ValueError:
+        return float(sp.sympify(s))
+
+# Parsed vectors are (magnitude, angle_deg, True) for polar input, (x, y, False) for components
+_ZERO_VECTOR = (0.0, 0.0, False)
+
+def _split_dict(vec: Dict[str, Any]) -> Tuple[float, float, bool]:
+    try:
+        return float(vec["magnitude"]), float(vec["angle_deg"]), True
+    except KeyError:
+        return _ZERO_VECTOR
+
+def _split_list(vec: Any) -> Tuple[float, float, bool]:
+    if len(vec) == 2:
+        return float(vec[0]), float(vec[1]), False
+    return _ZERO_VECTOR
+
+def _split_str(vec: str) -> Tuple[float, float, bool]:
+    try:
+        if "at" in vec:
+            mag = float(vec.split("=")[1].split()[0])
+            angle = float(vec.split("at")[1].split()[0])
+            return mag, angle, True
+    except Exception:
+        pass
+    return _ZERO_VECTOR
+
+def _split_default(vec: Any) -> Tuple[float, float, bool]:
+    return _ZERO_VECTOR
+
+_DISPATCH = {dict: _split_dict, list: _split_list, tuple: _split_list, str: _split_str}
+
+def _split_vector(vec: Any) -> Tuple[float, float, bool]:
     # Accepts: [x, y], {"magnitude": m, "angle_deg": a}, or "F=3N at 30 deg"
-    if isinstance(vec, dict) and "magnitude" in vec and "angle_deg" in vec:
-        angle_rad = math.radians(vec["angle_deg"])
-        x = vec["magnitude"] * math.cos(angle_rad)
-        y = vec["magnitude"] * math.sin(angle_rad)
-        return [x, y]
-    elif isinstance(vec, list) and len(vec) == 2:
-        return [float(vec[0]), float(vec[1])]
-    elif isinstance(vec, str):
-        try:
-            if "at" in vec:
-                mag = float(vec.split("=")[1].split()[0])
-                angle = float(vec.split("at")[1].split()[0])
-                angle_rad = math.radians(angle)
-                x = mag * math.cos(angle_rad)
-                y = mag * math.sin(angle_rad)
-                return [x, y]
-        except Exception:
-            pass
-    return [0.0, 0.0]
+    return _DISPATCH.get(type(vec), _split_default)(vec)
+
+def parse_vector(vec: Any) -> List[float]:
+    a, b, polar = _split_vector(vec)
+    if polar:
+        angle_rad = math.radians(b)
+        return [a * math.cos(angle_rad), a * math.sin(angle_rad)]
+    return [a, b]
 
 def vector_label(vec: List[float], name: str = "", unit: str = "N") -> str:
-    mag = math.hypot(vec[0], vec[1])
-    angle = (math.degrees(math.atan2(vec[1], vec[0])) + 360) % 360
+    mag, angle = _xy_to_polar(vec[0], vec[1])
     return f"{name} ({mag:.2f} {unit} @ {angle:.1f}°)"
 
-def draw_free_body(forces: List[Dict[str, Any]], object_name: str = "Body") -> str:
-    dwg = svgwrite.Drawing(size=(400, 400))
-    center = (200, 200)
-    dwg.add(dwg.circle(center=center, r=20, fill="lightgrey", stroke="black", stroke_width=2))
-    dwg.add(dwg.text(object_name, insert=(center[0] - 22, center[1] + 45), font_size="16px", fill="black"))
+# Everything up to the force arrows is the same for every diagram: the <svg>
+# root, the arrowhead marker in <defs>, and the body circle. Only the body's
+# label text follows it.
+_SVG_HEADER = (
+    b'<svg baseProfile="full" height="400" version="1.1" width="400" '
+    b'xmlns="http://www.w3.org/2000/svg" xmlns:ev="http://www.w3.org/2001/xml-events" '
+    b'xmlns:xlink="http://www.w3.org/1999/xlink">'
+    b'<defs><marker id="arrow" markerHeight="10" markerWidth="10" orient="auto" refX="10" refY="5">'
+    b'<polygon fill="black" points="0,0 10,5 0,10" /></marker></defs>'
+    b'<circle cx="200" cy="200" fill="lightgrey" r="20" stroke="black" stroke-width="2" />'
+    b'<text fill="black" font-size="16px" x="178" y="245">'
+)
 
-    color_cycle = ["red", "blue", "green", "purple", "orange", "brown", "darkcyan"]
+_COLOR_CYCLE = ("red", "blue", "green", "purple", "orange", "brown", "darkcyan")
 
-    # Define the arrowhead marker ONCE and add it to defs
-    arrow_marker = dwg.marker(insert=(10, 5), size=(10, 10), orient="auto", id="arrow")
-    arrow_marker.add(dwg.polygon(points=[(0, 0), (10, 5), (0, 10)], fill="black"))
-    dwg.defs.add(arrow_marker)
+def draw_free_body(forces: List[Dict[str, Any]], object_name: str = "Body") -> str:
+    cx, cy = 200, 200
+    buf = bytearray(_SVG_HEADER)
+    buf += f"{escape(object_name)}</text>".encode()
+
+    colors = itertools.cycle(_COLOR_CYCLE)
+    marker_iri = "url(#arrow)"
 
-    for idx, force in enumerate(forces):
+    for force in forces:
         vec = parse_vector(force["vector"])
-        mag = math.hypot(vec[0], vec[1])
         angle = math.atan2(vec[1], vec[0])
-        length = max(30, mag * 30)
-        x2 = center[0] + length * math.cos(angle)
-        y2 = center[1] - length * math.sin(angle)  # SVG y-axis is down
-        color = color_cycle[idx % len(color_cycle)]
-
-        # Draw the force arrow using the marker (FIXED!)
-        dwg.add(
-            dwg.line(
-                start=center,
-                end=(x2, y2),
-                stroke=color,
-                stroke_width=4,
-                marker_end=arrow_marker.get_funciri()
-            )
-        )
+        length = max(30, math.hypot(vec[0], vec[1]) * 30)
+        x2 = cx + length * math.cos(angle)
+        y2 = cy - length * math.sin(angle)  # SVG y-axis is down
+        color = next(colors)
+
+        # Draw the force arrow using the marker
+        buf += (
+            f'<line marker-end="{marker_iri}" stroke="{color}" stroke-width="4" '
+            f'x1="{cx}" x2="{x2}" y1="{cy}" y2="{y2}" />'
+        ).encode()
 
         # Label the arrow
         label = force.get("label", vector_label(vec))
-        label_x = (center[0] + x2) / 2 + 10
-        label_y = (center[1] + y2) / 2 - 10
-        dwg.add(dwg.text(label, insert=(label_x, label_y), font_size="12px", fill=color))
+        label_x = (cx + x2) / 2 + 10
+        label_y = (cy + y2) / 2 - 10
+        buf += (
+            f'<text fill="{color}" font-size="12px" x="{label_x}" y="{label_y}">{escape(str(label))}</text>'
+        ).encode()
 
-    return dwg.tostring()
+    buf += b"</svg>"
+    return buf.decode()
 
 @mcp.tool(description="Create a free body diagram (SVG) given a list of forces. Each force: {label, vector: [x, y] or {'magnitude': m, 'angle_deg': a}}.")
 async def free_body(forces: List[Dict[str, Any]], object_name: str = "Body") -> str:
@@ -83,13 +124,12 @@ async def free_body(forces: List[Dict[str, Any]], object_name: str = "Body") ->
 
 @mcp.tool(description="Given a list of force vectors, compute the net force (sum), with magnitude and direction (degrees).")
 async def net_force(forces: List[Any]) -> str:
-    net_x, net_y = 0, 0
+    net_x, net_y = 0.0, 0.0
     for f in forces:
         x, y = parse_vector(f)
         net_x += x
         net_y += y
-    mag = math.hypot(net_x, net_y)
-    angle = (math.degrees(math.atan2(net_y, net_x)) + 360) % 360
+    mag, angle = _xy_to_polar(net_x, net_y)
     return f"Net force: {mag:.2f} N at {angle:.1f}° (from +x axis, CCW)\nComponents: ({net_x:.2f} N, {net_y:.2f} N)"
 
 @mcp.tool(description="Given math/physics equations or raw numbers for forces, compute magnitudes, directions, and create a free body diagram.")
@@ -104,7 +144,7 @@ async def smart_diagram(forces: List[Any], object_name: str = "Body") -> str:
             force_dicts.append({"label": f"F{idx+1}", "vector": f})
         elif isinstance(f, str):
             try:
-                mag = float(sp.sympify(f))
+                mag = _sympify_float(f)
                 force_dicts.append({"label": f"F{idx+1}", "vector": [mag, 0]})
             except Exception:
                 pass
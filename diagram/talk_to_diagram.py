@@ -1,22 +1,76 @@
 #!/usr/bin/env python3
+import argparse
 import asyncio
 import json
-import requests
+import re
+import aiohttp
+import orjson
 import os
-import subprocess
 from datetime import datetime
+from pathlib import Path
 from contextlib import AsyncExitStack
+from aioconsole import ainput
 import cairosvg  # <-- New import
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+# TOOL/ARGS header in the LLM output. ARGS is decoded from the "{" after it with
+# raw_decode, so it may span lines and nest objects.
+_TOOL_RE = re.compile(r"TOOL:\s*(\S+)\s*\nARGS:\s*(?=\{)")
+_ARGS_DECODER = json.JSONDecoder()
+
+SYSTEM_PROMPT = """
+You are a physics free body diagram expert.
+- If the user asks for a free body diagram, use the TOOL: free_body with a list of forces, each as {'label': 'Weight', 'vector': {'magnitude': 10, 'angle_deg': 270}} or as [x, y].
+- If the user gives raw numbers or equations, use the smart_diagram tool and extract all necessary values.
+- If the user asks for net force, use net_force.
+
+Always respond in this format:
+
+TOOL: <tool_name>
+ARGS: {<json dictionary>}
+
+Examples:
+TOOL: free_body
+ARGS: {"forces": [{"label": "Weight", "vector": {"magnitude": 10, "angle_deg": 270}}, {"label": "Normal", "vector": [0, 10]}], "object_name": "Box"}
+
+TOOL: net_force
+ARGS: {"forces": [[5, 3], {"magnitude": 10, "angle_deg": 180}]}
+
+TOOL: smart_diagram
+ARGS: {"forces": ["20", {"magnitude": 5, "angle_deg": 0}, [0, -8]], "object_name": "Cart"}
+
+NEVER include explanations, just TOOL and ARGS.
+
+Show the diagram in line.
+"""
+SYSTEM_PROMPT_JSON = orjson.dumps(SYSTEM_PROMPT)
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 class OllamaMCPClient:
     def __init__(self, ollama_model="llama3", ollama_host="http://localhost:11434"):
         self.ollama_model = ollama_model
         self.ollama_host = ollama_host
+        self.request_prefix = b'{"model":' + orjson.dumps(ollama_model) + b',"stream":true'
         self.mcp_session = None
+        self.http_session = None
+        self.pdf_tasks = set()
         self.exit_stack = AsyncExitStack()
 
+    def open_http_session(self):
+        self.http_session = aiohttp.ClientSession(
+            base_url=self.ollama_host,
+            connector=aiohttp.TCPConnector(limit=16, keepalive_timeout=60)
+        )
+
+    async def warm_up_ollama(self):
+        # A generate request without a prompt just loads the model into memory
+        try:
+            async with self.http_session.post("/api/generate", json={"model": self.ollama_model}) as response:
+                await response.read()
+        except aiohttp.ClientError as e:
+            print(f"[Ollama Error] Could not preload model: {e}")
+
     async def connect_to_server(self, server_script_path: str, cwd: str):
         command = "uv" if server_script_path.endswith(".py") else "node"
         args = ["run", server_script_path] if command == "uv" else [server_script_path]
@@ -34,21 +88,37 @@ class OllamaMCPClient:
         for tool in tools.tools:
             print(f"  • {tool.name}: {tool.description}")
 
-    async def call_ollama(self, prompt, system_prompt=None):
-        def _make_request():
-            url = f"{self.ollama_host}/api/generate"
-            data = {
-                "model": self.ollama_model,
-                "prompt": prompt,
-                "stream": False
-            }
-            if system_prompt:
-                data["system"] = system_prompt
-            response = requests.post(url, json=data)
-            if response.status_code == 200:
-                return response.json()["response"]
-            return f"[Ollama Error] Status code {response.status_code}"
-        return await asyncio.to_thread(_make_request)
+    async def call_ollama(self, prompt, system_json=None, on_text=None):
+        # system_json is the system prompt already encoded as a JSON string
+        # (e.g. SYSTEM_PROMPT_JSON), so only the user prompt is encoded per call
+        body = [self.request_prefix]
+        if system_json:
+            body += [b',"system":', system_json]
+        body += [b',"prompt":', orjson.dumps(prompt), b"}"]
+        async with self.http_session.post("/api/generate", data=b"".join(body), headers=JSON_HEADERS) as response:
+            if response.status != 200:
+                return f"[Ollama Error] Status code {response.status}"
+            # Ollama streams NDJSON chunks; show on_text the answer so far each time
+            # a line completes, while the rest is still being generated.
+            parts = []
+            async for chunk in response.content:
+                if not chunk.strip():
+                    continue
+                token = orjson.loads(chunk).get("response", "")
+                parts.append(token)
+                if on_text and "\n" in token:
+                    on_text("".join(parts))
+            text = "".join(parts)
+            if on_text:
+                on_text(text)
+            return text
+
+    async def aclose(self):
+        if self.pdf_tasks:
+            await asyncio.gather(*self.pdf_tasks)
+        if self.http_session:
+            await self.http_session.close()
+            self.http_session = None
 
     async def call_mcp_tool(self, tool_name, args):
         if not self.mcp_session:
@@ -59,106 +129,151 @@ class OllamaMCPClient:
         except Exception as e:
             return f"[MCP Exception] {e}"
 
-    def maybe_save_svg(self, svg_string):
-        """Save SVG to a file if it's valid SVG, auto-open in VS Code, convert to PDF, return the path or None."""
+    async def maybe_save_svg(self, svg_string):
+        """Save SVG to a file if it's valid SVG, auto-open in VS Code, convert to PDF in the background, return the path or None."""
         if isinstance(svg_string, str) and svg_string.strip().startswith("<svg"):
-            filename = f"diagram_{datetime.now().strftime('%Y%m%d_%H%M%S')}.svg"
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(svg_string)
+            filename = f"diagram_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.svg"
+            await asyncio.to_thread(Path(filename).write_text, svg_string, encoding="utf-8")
             print(f"\n🖼️ SVG Free Body Diagram saved as '{filename}'! Opening in VS Code...\n")
-            try:
-                subprocess.run(["code", filename])
-            except Exception as e:
-                print("Couldn't auto-open SVG in VS Code:", e)
-            # Convert SVG to PDF
+            # Convert SVG to PDF without holding up the next prompt
             pdf_filename = filename.replace(".svg", ".pdf")
-            try:
-                cairosvg.svg2pdf(url=filename, write_to=pdf_filename)
-                print(f"📄 PDF version also saved as '{pdf_filename}'")
-                try:
-                    subprocess.run(["code", pdf_filename])
-                except Exception as e:
-                    print("Couldn't auto-open PDF in VS Code:", e)
-            except Exception as e:
-                print("Couldn't convert SVG to PDF:", e)
+            task = asyncio.create_task(self.save_pdf(svg_string, pdf_filename))
+            self.pdf_tasks.add(task)
+            task.add_done_callback(self.pdf_tasks.discard)
+            await self.open_in_vscode(filename, "SVG")
             return filename
         return None
 
-    async def process_diagram_request(self, user_query):
-        print(f"📥 User query: {user_query}")
-
-        system_prompt = """
-You are a physics free body diagram expert.
-- If the user asks for a free body diagram, use the TOOL: free_body with a list of forces, each as {'label': 'Weight', 'vector': {'magnitude': 10, 'angle_deg': 270}} or as [x, y].
-- If the user gives raw numbers or equations, use the smart_diagram tool and extract all necessary values.
-- If the user asks for net force, use net_force.
-
-Always respond in this format:
-
-TOOL: <tool_name>
-ARGS: {<json dictionary>}
-
-Examples:
-TOOL: free_body
-ARGS: {"forces": [{"label": "Weight", "vector": {"magnitude": 10, "angle_deg": 270}}, {"label": "Normal", "vector": [0, 10]}], "object_name": "Box"}
+    async def save_pdf(self, svg_string, pdf_filename):
+        try:
+            await asyncio.to_thread(cairosvg.svg2pdf, bytestring=svg_string.encode(), write_to=pdf_filename)
+            print(f"📄 PDF version also saved as '{pdf_filename}'")
+        except Exception as e:
+            print("Couldn't convert SVG to PDF:", e)
+            return
+        await self.open_in_vscode(pdf_filename, "PDF")
 
-TOOL: net_force
-ARGS: {"forces": [[5, 3], {"magnitude": 10, "angle_deg": 180}]}
+    async def open_in_vscode(self, filename, kind):
+        try:
+            process = await asyncio.create_subprocess_exec("code", filename)
+            await process.wait()
+        except Exception as e:
+            print(f"Couldn't auto-open {kind} in VS Code:", e)
 
-TOOL: smart_diagram
-ARGS: {"forces": ["20", {"magnitude": 5, "angle_deg": 0}, [0, -8]], "object_name": "Cart"}
+    async def process_diagram_request(self, user_query):
+        print(f"📥 User query: {user_query}")
 
-NEVER include explanations, just TOOL and ARGS.
+        tool_task, parse_error = None, False
 
-Show the diagram in line.
-"""
+        def on_text(text):
+            nonlocal tool_task, parse_error
+            if tool_task:
+                return
+            match = _TOOL_RE.search(text)
+            if not match:
+                return
+            try:
+                args, _ = _ARGS_DECODER.raw_decode(text, match.end())
+            except json.JSONDecodeError:
+                parse_error = True
+                return
+            if args:
+                # Start the tool right away instead of waiting for the LLM to finish.
+                tool_name = match.group(1)
+                print(f"🔧 Calling MCP tool: {tool_name} with args {args}")
+                tool_task = asyncio.create_task(self.call_mcp_tool(tool_name, args))
 
-        llm_response = await self.call_ollama(user_query, system_prompt)
+        llm_response = await self.call_ollama(user_query, SYSTEM_PROMPT_JSON, on_text=on_text)
         print(f"🧠 LLM suggested:\n{llm_response}")
 
-        tool_name, args = None, {}
-        for line in llm_response.splitlines():
-            if line.startswith("TOOL:"):
-                tool_name = line.split("TOOL:")[1].strip()
-            elif line.startswith("ARGS:"):
-                try:
-                    args = json.loads(line.split("ARGS:")[1].strip())
-                except json.JSONDecodeError:
-                    print("[Parse Error] Could not decode ARGS.")
-                    return "[Parse Error] Could not decode ARGS."
-
-        if not tool_name or not args:
+        if not tool_task:
+            if parse_error:
+                print("[Parse Error] Could not decode ARGS.")
+                return "[Parse Error] Could not decode ARGS."
             print("[Error] Could not parse tool or arguments.")
             return "[Error] Could not parse tool or arguments."
 
-        print(f"🔧 Calling MCP tool: {tool_name} with args {args}")
-        mcp_result = await self.call_mcp_tool(tool_name, args)
+        mcp_result = await tool_task
+        # Tool results arrive as a list of content items; errors are plain strings
+        if isinstance(mcp_result, list):
+            mcp_result = "".join(c.text for c in mcp_result if hasattr(c, "text"))
 
-        if isinstance(mcp_result, str) and mcp_result.strip().startswith("<svg"):
-            self.maybe_save_svg(mcp_result)
+        if mcp_result.strip().startswith("<svg"):
+            await self.maybe_save_svg(mcp_result)
         else:
             print(f"\n🗣️ Assistant: {mcp_result}\n")
         return mcp_result
 
-    async def chat_loop(self):
-        print("🤖 Diagram Assistant ready. Type 'quit' to exit.\n")
-        await self.connect_to_server("diagram.py", cwd=os.getcwd())
-
+    async def drain_queue(self, queue: asyncio.Queue, batch_size: int = 4):
+        """Answer queued user queries, up to batch_size at a time concurrently.
+        A None item stops the worker once the queue has been emptied."""
+        stopping = False
         while True:
-            user_input = input("📝 Describe your free body diagram scenario: ").strip()
-            if user_input.lower() in ("quit", "exit", "q"):
-                print("👋 Exiting. Draw physics every day!")
+            batch = [await queue.get()]
+            while len(batch) < batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            responses = await asyncio.gather(
+                *(self.process_diagram_request(query) for query in batch if query),
+                return_exceptions=True
+            )
+            for response in responses:
+                if isinstance(response, Exception):
+                    print(f"[Error] {response}")
+            for _ in batch:
+                queue.task_done()
+            stopping = stopping or None in batch
+            if stopping and queue.empty():
                 break
-            if not user_input:
-                continue
-            try:
-                await self.process_diagram_request(user_input)
-            except Exception as e:
-                print(f"[Error] {e}")
 
-async def main():
+    async def chat_loop(self, queue: asyncio.Queue | None = None):
+        print("🤖 Diagram Assistant ready. Type 'quit' to exit.\n")
+        try:
+            # Spawn the MCP server and load the Ollama model at the same time
+            self.open_http_session()
+            await asyncio.gather(
+                self.connect_to_server("diagram.py", cwd=os.getcwd()),
+                self.warm_up_ollama()
+            )
+
+            if queue is not None:
+                await self.drain_queue(queue)
+                return
+
+            while True:
+                user_input = (await ainput("📝 Describe your free body diagram scenario: ")).strip()
+                if user_input.lower() in ("quit", "exit", "q"):
+                    print("👋 Exiting. Draw physics every day!")
+                    break
+                if not user_input:
+                    continue
+                try:
+                    await self.process_diagram_request(user_input)
+                except Exception as e:
+                    print(f"[Error] {e}")
+        finally:
+            await self.aclose()
+
+async def main(batch=None):
     client = OllamaMCPClient()
-    await client.chat_loop()
+    if batch is None:
+        await client.chat_loop()
+        return
+    # `uv run talk_to_diagram.py --batch queries.txt`: one query per line, answered concurrently
+    queue = asyncio.Queue()
+    with batch:
+        for line in batch:
+            if line.strip():
+                queue.put_nowait(line.strip())
+    queue.put_nowait(None)
+    await client.chat_loop(queue)
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--batch", metavar="FILE", type=argparse.FileType("r", encoding="utf-8"),
+        help="answer every line of FILE ('-' for stdin) as a query, then exit"
+    )
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(parse_args().batch))
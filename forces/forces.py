@@ -1,9 +1,13 @@
-from typing import Any
+import functools
+import math
+import re
+from typing import Any, Sequence
 from mcp.server.fastmcp import FastMCP
 
 mcp = FastMCP("forces")
 
 GRAVITY = 9.8  # m/s^2
+_DEG2RAD = math.pi / 180.0
 
 @mcp.tool()
 def weight(mass_kg: float, gravity: float = GRAVITY) -> float:
@@ -33,24 +37,30 @@ def tension(weight: float = None, mass: float = None, gravity: float = GRAVITY)
 @mcp.tool()
 def normal_force(mass: float, gravity: float = GRAVITY, incline_angle_deg: float = 0) -> float:
     """Calculate normal force (N). For flat surface, normal = weight. For incline, normal = mg*cos(theta)."""
-    import math
-    theta = math.radians(incline_angle_deg)
-    return mass * gravity * (1 if incline_angle_deg == 0 else math.cos(theta))
+    return mass * gravity * math.cos(incline_angle_deg * _DEG2RAD)
 
 @mcp.tool()
-def net_force(forces: list[float]) -> float:
+def net_force(forces: Sequence[float]) -> float:
     """Calculate net force (N) as the sum of all forces (positive for right/up, negative for left/down)."""
-    return sum(forces)
+    return math.fsum(forces)
+
+# Keyword -> breakdown, in priority order (earlier entries win when several match)
+BREAKDOWNS = {
+    "hanging": "If at rest or moving at constant velocity, Tension = Weight = m * g",
+    "elevator": "If at rest or moving at constant velocity, Tension = Weight = m * g",
+    "block on table": "Normal force = Weight, Friction = μ * Normal force",
+}
+_BREAKDOWN_PRIORITY = {keyword: rank for rank, keyword in enumerate(BREAKDOWNS)}
+_BREAKDOWN_RE = re.compile("|".join(map(re.escape, BREAKDOWNS)), re.IGNORECASE)
 
 @mcp.tool()
+@functools.lru_cache(maxsize=256)
 def force_breakdown(situation: str) -> str:
     """Given a situation, describe the force relationships (e.g., 'In equilibrium, tension=weight')."""
-    situation = situation.lower()
-    if "hanging" in situation or "elevator" in situation:
-        return "If at rest or moving at constant velocity, Tension = Weight = m * g"
-    if "block on table" in situation:
-        return "Normal force = Weight, Friction = μ * Normal force"
-    return "Describe your situation with objects, surfaces, and directions for a breakdown."
+    matches = [m.lower() for m in _BREAKDOWN_RE.findall(situation)]
+    if not matches:
+        return "Describe your situation with objects, surfaces, and directions for a breakdown."
+    return BREAKDOWNS[min(matches, key=_BREAKDOWN_PRIORITY.__getitem__)]
 
 if __name__ == "__main__":
     mcp.run(transport="stdio")
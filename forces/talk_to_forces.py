@@ -1,12 +1,21 @@
 import asyncio
 import json
-import requests
+import re
+import aiohttp
+import orjson
 from contextlib import AsyncExitStack
+from aioconsole import ainput
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
 # Update this to your actual Ollama model if needed
 OLLAMA_MODEL = "llama3"
+OLLAMA_HOST = "http://localhost:11434"
+
+# TOOL/ARGS header in the LLM output. ARGS is decoded from the "{" after it with
+# raw_decode, so it may span lines and nest objects.
+_TOOL_RE = re.compile(r"TOOL:\s*(\S+)\s*\nARGS:\s*(?=\{)")
+_ARGS_DECODER = json.JSONDecoder()
 
 SYSTEM_PROMPT = """
 You are a physics forces assistant. You have access to these tools:
@@ -33,27 +42,53 @@ TOOL: weight
 ARGS: {"mass_kg": 10}
 """
 
-def call_ollama(user_query, system_prompt=SYSTEM_PROMPT):
-    url = "http://localhost:11434/api/generate"
-    data = {
-        "model": OLLAMA_MODEL,
-        "prompt": user_query,
-        "stream": False,
-        "system": system_prompt
-    }
+# Request body pieces that never change, JSON-encoded once at import
+REQUEST_PREFIX = b'{"model":' + orjson.dumps(OLLAMA_MODEL) + b',"stream":true'
+SYSTEM_PROMPT_JSON = orjson.dumps(SYSTEM_PROMPT)
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+async def call_ollama(http_session, user_query, system_json=SYSTEM_PROMPT_JSON, on_text=None):
+    body = b"".join([REQUEST_PREFIX, b',"system":', system_json, b',"prompt":', orjson.dumps(user_query), b"}"])
     print("📡 Calling Ollama to parse your request...")
-    resp = requests.post(url, json=data)
-    if resp.status_code == 200:
-        return resp.json()["response"]
-    else:
-        print(f"[Ollama error] {resp.text}")
-        return None
+    async with http_session.post("/api/generate", data=body, headers=JSON_HEADERS) as resp:
+        if resp.status != 200:
+            print(f"[Ollama error] {await resp.text()}")
+            return None
+        # Ollama streams NDJSON chunks; show on_text the answer so far each time
+        # a line completes, while the rest is still being generated.
+        parts = []
+        async for chunk in resp.content:
+            if not chunk.strip():
+                continue
+            token = orjson.loads(chunk).get("response", "")
+            parts.append(token)
+            if on_text and "\n" in token:
+                on_text("".join(parts))
+        text = "".join(parts)
+        if on_text:
+            on_text(text)
+        return text
+
+async def warm_up_ollama(http_session):
+    # A generate request without a prompt just loads the model into memory
+    try:
+        async with http_session.post("/api/generate", json={"model": OLLAMA_MODEL}) as resp:
+            await resp.read()
+    except aiohttp.ClientError as e:
+        print(f"[Ollama error] Could not preload model: {e}")
 
 class ForcesMCPClient:
     def __init__(self):
         self.mcp_session = None
+        self.http_session = None
         self.exit_stack = AsyncExitStack()
 
+    def open_http_session(self):
+        self.http_session = aiohttp.ClientSession(
+            base_url=OLLAMA_HOST,
+            connector=aiohttp.TCPConnector(limit=16, keepalive_timeout=60)
+        )
+
     async def connect_to_server(self, server_script_path: str, cwd: str):
         server_params = StdioServerParameters(
             command="uv",
@@ -69,6 +104,11 @@ class ForcesMCPClient:
         for tool in tools.tools:
             print(f"  • {tool.name}: {tool.description}")
 
+    async def aclose(self):
+        if self.http_session:
+            await self.http_session.close()
+            self.http_session = None
+
     async def call_mcp_tool(self, tool_name, args):
         if not self.mcp_session:
             return "[MCP Error] MCP session not started"
@@ -80,40 +120,58 @@ class ForcesMCPClient:
 
     async def chat_loop(self):
         print("🤖 Forces Assistant ready. Type 'quit' to exit.\n")
-        await self.connect_to_server("forces.py", cwd="/Users/jakubpierog/Documents/newton_forces_mcp/forces")
-
-
-        while True:
-            user_input = input("\nAsk about forces (type 'quit' to exit): ").strip()
-            if user_input.lower() in ("quit", "exit", "q"):
-                print("👋 Exiting. Stay strong!")
-                break
-            if not user_input:
-                continue
-
-            # 1. Parse the user input using Ollama LLM
-            llm_response = call_ollama(user_input, SYSTEM_PROMPT)
-            print(f"\n🧠 LLM parsed:\n{llm_response.strip()}")
-
-            # 2. Extract tool name and args
-            tool_name, args = None, {}
-            for line in llm_response.splitlines():
-                if line.startswith("TOOL:"):
-                    tool_name = line.split("TOOL:")[1].strip()
-                elif line.startswith("ARGS:"):
+        try:
+            # Spawn the MCP server and load the Ollama model at the same time
+            self.open_http_session()
+            await asyncio.gather(
+                self.connect_to_server("forces.py", cwd="/Users/jakubpierog/Documents/newton_forces_mcp/forces"),
+                warm_up_ollama(self.http_session)
+            )
+
+            while True:
+                user_input = (await ainput("\nAsk about forces (type 'quit' to exit): ")).strip()
+                if user_input.lower() in ("quit", "exit", "q"):
+                    print("👋 Exiting. Stay strong!")
+                    break
+                if not user_input:
+                    continue
+
+                # 1. Parse the user input using Ollama LLM, extracting the tool name
+                # and args as lines stream in so the tool starts before generation ends
+                tool_task, decode_error = None, None
+
+                def on_text(text):
+                    nonlocal tool_task, decode_error
+                    if tool_task:
+                        return
+                    match = _TOOL_RE.search(text)
+                    if not match:
+                        return
                     try:
-                        args = json.loads(line.split("ARGS:")[1].strip())
-                    except Exception as e:
-                        print(f"❌ Error decoding JSON: {e}")
-                        continue
-
-            if not tool_name or not args:
-                print("❌ Could not parse tool name/arguments. Try asking differently.")
-                continue
-
-            # 3. Call the MCP tool
-            response = await self.call_mcp_tool(tool_name, args)
-            print(f"\n🗣️ Assistant: {response}\n")
+                        args, _ = _ARGS_DECODER.raw_decode(text, match.end())
+                    except json.JSONDecodeError as e:
+                        decode_error = e
+                        return
+                    if args:
+                        # 2. Call the MCP tool
+                        tool_task = asyncio.create_task(self.call_mcp_tool(match.group(1), args))
+
+                llm_response = await call_ollama(self.http_session, user_input, SYSTEM_PROMPT_JSON, on_text=on_text)
+                if llm_response is None:
+                    continue
+                print(f"\n🧠 LLM parsed:\n{llm_response.strip()}")
+
+                if not tool_task:
+                    if decode_error:
+                        print(f"❌ Error decoding JSON: {decode_error}")
+                    print("❌ Could not parse tool name/arguments. Try asking differently.")
+                    continue
+
+                # 3. Collect the tool result
+                response = await tool_task
+                print(f"\n🗣️ Assistant: {response}\n")
+        finally:
+            await self.aclose()
 
 async def main():
     client = ForcesMCPClient()
@@ -1,43 +1,95 @@
+import functools
+from typing import Dict, Optional
 import sympy as sp
 import pint
 from mcp.server.fastmcp import FastMCP
 
 mcp = FastMCP("math_server")
-ureg = pint.UnitRegistry()
+# Parsed unit definitions are cached on disk, so a fresh server process
+# starts without re-reading pint's definition files.
+ureg = pint.UnitRegistry(cache_folder=":auto:")
 
+# Parsing is the expensive part of every tool, and the results are immutable,
+# so repeat expressions are served from these caches.
+@functools.lru_cache(maxsize=4096)
+def _parse_pint(expr: str):
+    return ureg.parse_expression(expr)
+
+@functools.lru_cache(maxsize=4096)
+def _to_base_units(expr: str):
+    return _parse_pint(expr).to_base_units()
+
+@functools.lru_cache(maxsize=4096)
+def _sympy_evaluate(expr: str):
+    val = sp.sympify(expr)
+    # Purely numeric input only needs evaluating; simplify is reserved for symbolic input
+    if not val.free_symbols:
+        return val.evalf(15)
+    return sp.simplify(val)
+
+@functools.lru_cache(maxsize=1024)
+def _compile_numeric(expr: str, symbols: tuple):
+    # Plain-math function of the given symbols, so repeat evaluations with
+    # new values skip sympy entirely
+    return sp.lambdify(sp.symbols(symbols), sp.sympify(expr), modules=["math"])
+
+@functools.lru_cache(maxsize=4096)
+def _convert_magnitude(expr: str, to_unit: str) -> float:
+    return _parse_pint(expr).to(to_unit).magnitude
+
+@functools.lru_cache(maxsize=1024)
+def _format_units(units) -> str:
+    return format(units, "~")
+
+def _format_quantity(quantity) -> str:
+    # Dimensionless results have an empty unit string
+    return f"{quantity.magnitude} {_format_units(quantity.units)}".rstrip()
+
+# Warm the parser with the most common units so the first real call is fast
+for _unit in ("N", "kg", "m", "s"):
+    _parse_pint(_unit)
+
+@functools.lru_cache(maxsize=4096)
 def evaluate_expression(expr: str) -> str:
     try:
         # Try evaluating with pint first (handles units)
-        result = ureg.parse_expression(expr)
-        base = result.to_base_units()
-        return f"{expr} = {result:~} = {base:~}"
+        result = _parse_pint(expr)
+        base = _to_base_units(expr)
+        return f"{expr} = {_format_quantity(result)} = {_format_quantity(base)}"
     except Exception as pint_exc:
         try:
             # Try sympy (symbolic, no units)
-            val = sp.sympify(expr)
-            return f"{expr} = {sp.simplify(val)}"
+            return f"{expr} = {_sympy_evaluate(expr)}"
         except Exception as sympy_exc:
             return f"Error: Could not evaluate expression. (Pint: {pint_exc}; SymPy: {sympy_exc})"
 
-@mcp.tool(description="Evaluate math expressions, with or without units. Example: '5N * 8kg', 'sqrt(16)', '(3/4) * (2/5)', or complex expressions with units.")
-async def evaluate(expr: str) -> str:
+def evaluate_with_values(expr: str, values: Dict[str, float]) -> str:
+    try:
+        names = tuple(sorted(values))
+        result = _compile_numeric(expr, names)(*(values[name] for name in names))
+        given = ", ".join(f"{name}={values[name]}" for name in names)
+        return f"{expr} = {result} (with {given})"
+    except Exception as e:
+        return f"Error: {e}"
+
+@mcp.tool(description="Evaluate math expressions, with or without units. Example: '5N * 8kg', 'sqrt(16)', '(3/4) * (2/5)', or complex expressions with units. Optionally give numeric values for symbols, e.g. expr 'm*a' with values {'m': 2, 'a': 9.8}.")
+async def evaluate(expr: str, values: Optional[Dict[str, float]] = None) -> str:
+    if values:
+        return evaluate_with_values(expr, values)
     return evaluate_expression(expr)
 
 @mcp.tool(description="Convert an answer to a different unit. Example: '2000 g' to 'kg', or '40 m kg2 / s2' to 'N'.")
 async def convert_answer(expr: str, to_unit: str) -> str:
     try:
-        qty = ureg.parse_expression(expr)
-        converted = qty.to(to_unit)
-        return f"{expr} = {converted.magnitude:.6g} {to_unit}"
+        return f"{expr} = {_convert_magnitude(expr, to_unit):.6g} {to_unit}"
     except Exception as e:
         return f"Error: {e}"
 
 @mcp.tool(description="Simplify units in an expression, expressing them in SI base units.")
 async def simplify_units(expr: str) -> str:
     try:
-        qty = ureg.parse_expression(expr)
-        base = qty.to_base_units()
-        return f"{expr} = {base:~}"
+        base = _to_base_units(expr)
+        return f"{expr} = {_format_quantity(base)}"
     except Exception as e:
         return f"Error: {e}"
 
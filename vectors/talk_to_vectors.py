@@ -1,18 +1,63 @@
 #!/usr/bin/env python3
+import argparse
 import asyncio
 import json
-import requests
+import re
+import aiohttp
+import orjson
+import uvloop
 from contextlib import AsyncExitStack
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+# TOOL/ARGS header in the LLM output. ARGS is decoded from the "{" after it with
+# raw_decode, so it may span lines and nest objects.
+_TOOL_RE = re.compile(r"TOOL:\s*(\S+)\s*\nARGS:\s*(?=\{)")
+# TOOLS: [{"tool": ..., "args": {...}}, ...] for several independent calls at once;
+# the array is decoded the same way as ARGS
+_TOOLS_RE = re.compile(r"TOOLS:\s*(?=\[)")
+JSON_HEADERS = {"Content-Type": "application/json"}
+_ARGS_DECODER = json.JSONDecoder()
+
+
+def parse_tool_calls(text):
+    """Return ([(tool_name, args), ...], error) for the TOOLS or TOOL/ARGS block in an LLM response."""
+    match = _TOOLS_RE.search(text)
+    if match:
+        try:
+            tools, _ = _ARGS_DECODER.raw_decode(text, match.end())
+            calls = [(call["tool"], call["args"]) for call in tools]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            return None, "[Parse Error] Could not decode TOOLS."
+        if not calls:
+            return None, "[Error] Could not parse tool or arguments."
+        return calls, None
+    match = _TOOL_RE.search(text)
+    if not match:
+        return None, "[Error] Could not parse tool or arguments."
+    try:
+        args, _ = _ARGS_DECODER.raw_decode(text, match.end())
+    except json.JSONDecodeError:
+        return None, "[Parse Error] Could not decode ARGS."
+    if not args:
+        return None, "[Error] Could not parse tool or arguments."
+    return [(match.group(1), args)], None
+
+
 class OllamaMCPClient:
     def __init__(self, ollama_model="llama3.2", ollama_host="http://localhost:11434"):
         self.ollama_model = ollama_model
         self.ollama_host = ollama_host
         self.mcp_session = None
+        self.http_session = None
         self.exit_stack = AsyncExitStack()
 
+    def open_http_session(self):
+        self.http_session = aiohttp.ClientSession(
+            base_url=self.ollama_host,
+            connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=60)
+        )
+
     async def connect_to_server(self, server_script_path: str, cwd: str):
         command = "uv" if server_script_path.endswith(".py") else "node"
         args = ["run", server_script_path] if command == "uv" else [server_script_path]
@@ -31,21 +76,44 @@ class OllamaMCPClient:
         for tool in tools.tools:
             print(f"  • {tool.name}: {tool.description}")
 
-    async def call_ollama(self, prompt, system_prompt=None):
-        def _make_request():
-            url = f"{self.ollama_host}/api/generate"
-            data = {
-                "model": self.ollama_model,
-                "prompt": prompt,
-                "stream": False
-            }
-            if system_prompt:
-                data["system"] = system_prompt
-            response = requests.post(url, json=data)
-            if response.status_code == 200:
-                return response.json()["response"]
-            return f"[Ollama Error] Status code {response.status_code}"
-        return await asyncio.to_thread(_make_request)
+    async def call_ollama(self, prompt, system_prompt=None, stop_at_tool=False, echo=False):
+        """Stream a completion from Ollama. With stop_at_tool, hang up once a complete
+        TOOL/ARGS or TOOLS block has arrived; with echo, print tokens as they come in."""
+        data = {
+            "model": self.ollama_model,
+            "prompt": prompt,
+            "stream": True
+        }
+        if system_prompt:
+            data["system"] = system_prompt
+        async with self.http_session.post("/api/generate", data=orjson.dumps(data), headers=JSON_HEADERS) as response:
+            if response.status != 200:
+                error = f"[Ollama Error] Status code {response.status}"
+                if echo:
+                    print(error, end="")
+                return error
+            parts = []
+            async for line in response.content:
+                if not line.strip():
+                    continue
+                token = orjson.loads(line).get("response", "")
+                parts.append(token)
+                if echo:
+                    print(token, end="", flush=True)
+                if stop_at_tool and "\n" in token:
+                    # A half-streamed block does not decode yet, so this only
+                    # succeeds once the whole TOOL/ARGS or TOOLS block is in
+                    _, error = parse_tool_calls("".join(parts))
+                    if not error:
+                        # Dropping the connection makes Ollama stop generating
+                        response.close()
+                        break
+            return "".join(parts)
+
+    async def aclose(self):
+        if self.http_session:
+            await self.http_session.close()
+            self.http_session = None
 
     async def call_mcp_tool(self, tool_name, args):
         if not self.mcp_session:
@@ -56,7 +124,11 @@ class OllamaMCPClient:
         except Exception as e:
             return f"[MCP Exception] {e}"
 
-    async def process_vector_request(self, user_query):
+    async def call_mcp_tools(self, calls):
+        """Run independent (tool_name, args) calls concurrently over the one MCP session."""
+        return await asyncio.gather(*(self.call_mcp_tool(name, args) for name, args in calls))
+
+    async def process_vector_request(self, user_query, echo=False):
         print(f"📥 User query: {user_query}")
 
         system_prompt = """You are a careful physics assistant for vectors. You can add, subtract, or convert vectors.
@@ -66,6 +138,7 @@ You have these tools:
 2. subtract_vectors(vector1, vector2)
 3. to_components(magnitude, angle_deg)
 4. to_polar(x, y)
+5. add_vectors_batch(vectors): sum of many vectors given as components
 
 Users may describe vectors by components ([x, y] in N), or magnitude/angle (N, degrees CCW from +x).
 
@@ -78,28 +151,31 @@ TOOL: to_components
 ARGS: {"magnitude": 6, "angle_deg": 120}
 TOOL: to_polar
 ARGS: {"x": -4, "y": 7}
+TOOL: add_vectors_batch
+ARGS: {"vectors": [[3, 4], [-1, 2], [5, 0]]}
+
+For several independent calls, list them all on one TOOLS line instead:
+TOOLS: [{"tool": "to_polar", "args": {"x": -4, "y": 7}}, {"tool": "to_components", "args": {"magnitude": 6, "angle_deg": 120}}]
 
 Always clarify direction, magnitude, and units in your answers.
 """
 
-        llm_response = await self.call_ollama(user_query, system_prompt)
+        llm_response = await self.call_ollama(user_query, system_prompt, stop_at_tool=True)
         print(f"🧠 LLM suggested:\n{llm_response}")
 
-        tool_name, args = None, {}
-        for line in llm_response.splitlines():
-            if line.startswith("TOOL:"):
-                tool_name = line.split("TOOL:")[1].strip()
-            elif line.startswith("ARGS:"):
-                try:
-                    args = json.loads(line.split("ARGS:")[1].strip())
-                except json.JSONDecodeError:
-                    return "[Parse Error] Could not decode ARGS."
-
-        if not tool_name or not args:
-            return "[Error] Could not parse tool or arguments."
+        calls, error = parse_tool_calls(llm_response)
+        if error:
+            if echo:
+                print(f"\n🗣️ Assistant: {error}\n")
+            return error
 
-        print(f"🔧 Calling MCP tool: {tool_name} with args {args}")
-        mcp_result = await self.call_mcp_tool(tool_name, args)
+        for tool_name, args in calls:
+            print(f"🔧 Calling MCP tool: {tool_name} with args {args}")
+        results = await self.call_mcp_tools(calls)
+        if len(results) == 1:
+            mcp_result = results[0]
+        else:
+            mcp_result = "\n".join(f"{name}: {result}" for (name, _), result in zip(calls, results))
         print(f"📦 MCP returned:\n{mcp_result}")
 
         final_prompt = f"""User asked: {user_query}
@@ -108,29 +184,83 @@ Tool result: {mcp_result}
 
 Respond naturally and *always* state the magnitude in Newtons, direction in degrees (counterclockwise from +x axis), and vector form in components and polar form if possible.
 """
-        final_response = await self.call_ollama(final_prompt)
+        if echo:
+            print("\n🗣️ Assistant: ", end="", flush=True)
+        final_response = await self.call_ollama(final_prompt, echo=echo)
+        if echo:
+            print("\n")
         return final_response
 
-    async def chat_loop(self):
-        print("🤖 Vectors Assistant ready. Type 'quit' to exit.\n")
-        await self.connect_to_server("vectors.py", cwd="/Users/jakubpierog/Documents/newton_forces_mcp/vectors")
-
+    async def drain_queue(self, queue: asyncio.Queue, batch_size: int = 4):
+        """Answer queued user queries, up to batch_size at a time concurrently.
+        A None item stops the worker once the queue has been emptied."""
+        stopping = False
         while True:
-            user_input = input("➕ Ask about vector addition/subtraction (be specific about units and direction!): ").strip()
-            if user_input.lower() in ("quit", "exit", "q"):
-                print("👋 Exiting. Vectors are fun!")
+            batch = [await queue.get()]
+            while len(batch) < batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            responses = await asyncio.gather(
+                *(self.process_vector_request(query) for query in batch if query),
+                return_exceptions=True
+            )
+            for response in responses:
+                if isinstance(response, Exception):
+                    print(f"[Error] {response}")
+                else:
+                    print(f"\n🗣️ Assistant: {response}\n")
+            for _ in batch:
+                queue.task_done()
+            stopping = stopping or None in batch
+            if stopping and queue.empty():
                 break
-            if not user_input:
-                continue
-            try:
-                response = await self.process_vector_request(user_input)
-                print(f"\n🗣️ Assistant: {response}\n")
-            except Exception as e:
-                print(f"[Error] {e}")
-
-async def main():
+
+    async def chat_loop(self, queue: asyncio.Queue | None = None):
+        print("🤖 Vectors Assistant ready. Type 'quit' to exit.\n")
+        try:
+            self.open_http_session()
+            await self.connect_to_server("vectors.py", cwd="/Users/jakubpierog/Documents/newton_forces_mcp/vectors")
+
+            if queue is not None:
+                await self.drain_queue(queue)
+                return
+
+            while True:
+                user_input = input("➕ Ask about vector addition/subtraction (be specific about units and direction!): ").strip()
+                if user_input.lower() in ("quit", "exit", "q"):
+                    print("👋 Exiting. Vectors are fun!")
+                    break
+                if not user_input:
+                    continue
+                try:
+                    await self.process_vector_request(user_input, echo=True)
+                except Exception as e:
+                    print(f"[Error] {e}")
+        finally:
+            await self.aclose()
+
+async def main(batch=None):
     client = OllamaMCPClient()
-    await client.chat_loop()
+    if batch is None:
+        await client.chat_loop()
+        return
+    # `uv run talk_to_vectors.py --batch queries.txt`: one query per line, answered concurrently
+    queue = asyncio.Queue()
+    with batch:
+        for line in batch:
+            if line.strip():
+                queue.put_nowait(line.strip())
+    queue.put_nowait(None)
+    await client.chat_loop(queue)
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--batch", metavar="FILE", type=argparse.FileType("r", encoding="utf-8"),
+        help="answer every line of FILE ('-' for stdin) as a query, then exit"
+    )
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop's event loop is cheaper on the many small stdio/HTTP reads and writes
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    asyncio.run(main(parse_args().batch))
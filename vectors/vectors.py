@@ -1,22 +1,32 @@
+import cmath
 import math
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from mcp.server.fastmcp import FastMCP
 
 mcp = FastMCP("vectors")
 
+_DEG2RAD = math.pi / 180.0
+_RAD2DEG = 180.0 / math.pi
+
+def _polar_to_xy(magnitude: float, angle_deg: float) -> Tuple[float, float]:
+    # Both components from one C call instead of separate math.cos/math.sin lookups and calls
+    z = cmath.rect(magnitude, angle_deg * _DEG2RAD)
+    return z.real, z.imag
+
+def _xy_to_polar(x: float, y: float) -> Tuple[float, float]:
+    magnitude = math.hypot(x, y)
+    angle = math.atan2(y, x) * _RAD2DEG
+    if angle < 0:
+        angle += 360  # Always report angle as 0-360
+    return magnitude, angle
+
 def from_magnitude_angle(magnitude: float, angle_deg: float) -> List[float]:
     """Convert magnitude/angle (deg) to x/y components."""
-    angle_rad = math.radians(angle_deg)
-    x = magnitude * math.cos(angle_rad)
-    y = magnitude * math.sin(angle_rad)
-    return [x, y]
+    return list(_polar_to_xy(magnitude, angle_deg))
 
 def to_magnitude_angle(x: float, y: float) -> Dict[str, float]:
     """Convert x/y components to magnitude and angle (deg from x axis, CCW)."""
-    magnitude = math.hypot(x, y)
-    angle = math.degrees(math.atan2(y, x))
-    if angle < 0:
-        angle += 360  # Always report angle as 0-360
+    magnitude, angle = _xy_to_polar(x, y)
     return {"magnitude": magnitude, "angle_deg": angle}
 
 def vector_display(components: List[float]) -> str:
@@ -27,33 +37,47 @@ def vector_display(components: List[float]) -> str:
         f"Direction: {mag_angle['angle_deg']:.2f}° CCW from +x axis"
     )
 
+_VECTOR_ERROR = "Error: Each vector must be components [x, y] (in N), or dict with 'magnitude' and 'angle_deg'."
+_BATCH_ERROR = "Error: vectors must be a list of components [x, y] (in N)."
+
+def _coerce(v) -> tuple:
+    """Return (x, y) for a vector given as [x, y] or {'magnitude': ..., 'angle_deg': ...}."""
+    if isinstance(v, (list, tuple)) and len(v) == 2:
+        return v[0], v[1]
+    if isinstance(v, dict):
+        try:
+            return _polar_to_xy(v['magnitude'], v['angle_deg'])
+        except KeyError:
+            pass
+    raise TypeError(_VECTOR_ERROR)
+
 @mcp.tool(description="Add two force vectors. Each can be given as components (x, y) in Newtons, or as {'magnitude': value, 'angle_deg': value} with angle in degrees (CCW from x).")
 async def add_vectors(vector1: Any, vector2: Any) -> str:
-    v1 = vector1
-    v2 = vector2
-    # Convert to [x, y] if given as magnitude/angle
-    if isinstance(v1, dict) and 'magnitude' in v1 and 'angle_deg' in v1:
-        v1 = from_magnitude_angle(v1['magnitude'], v1['angle_deg'])
-    if isinstance(v2, dict) and 'magnitude' in v2 and 'angle_deg' in v2:
-        v2 = from_magnitude_angle(v2['magnitude'], v2['angle_deg'])
-    if not (isinstance(v1, list) and isinstance(v2, list) and len(v1) == 2 and len(v2) == 2):
-        return "Error: Each vector must be components [x, y] (in N), or dict with 'magnitude' and 'angle_deg'."
-    result = [v1[0] + v2[0], v1[1] + v2[1]]
-    return f"Sum of vectors:\n{vector_display(result)}"
+    try:
+        x1, y1 = _coerce(vector1)
+        x2, y2 = _coerce(vector2)
+    except TypeError:
+        return _VECTOR_ERROR
+    return f"Sum of vectors:\n{vector_display([x1 + x2, y1 + y2])}"
 
 @mcp.tool(description="Subtract vector2 from vector1. Each can be given as components (x, y) in Newtons, or as {'magnitude': value, 'angle_deg': value} with angle in degrees (CCW from x).")
 async def subtract_vectors(vector1: Any, vector2: Any) -> str:
-    v1 = vector1
-    v2 = vector2
-    # Convert to [x, y] if given as magnitude/angle
-    if isinstance(v1, dict) and 'magnitude' in v1 and 'angle_deg' in v1:
-        v1 = from_magnitude_angle(v1['magnitude'], v1['angle_deg'])
-    if isinstance(v2, dict) and 'magnitude' in v2 and 'angle_deg' in v2:
-        v2 = from_magnitude_angle(v2['magnitude'], v2['angle_deg'])
-    if not (isinstance(v1, list) and isinstance(v2, list) and len(v1) == 2 and len(v2) == 2):
-        return "Error: Each vector must be components [x, y] (in N), or dict with 'magnitude' and 'angle_deg'."
-    result = [v1[0] - v2[0], v1[1] - v2[1]]
-    return f"Difference of vectors:\n{vector_display(result)}"
+    try:
+        x1, y1 = _coerce(vector1)
+        x2, y2 = _coerce(vector2)
+    except TypeError:
+        return _VECTOR_ERROR
+    return f"Difference of vectors:\n{vector_display([x1 - x2, y1 - y2])}"
+
+@mcp.tool(description="Add any number of force vectors given as components [[x1, y1], [x2, y2], ...] in Newtons.")
+async def add_vectors_batch(vectors: List[List[float]]) -> str:
+    if not all(isinstance(v, (list, tuple)) and len(v) == 2 for v in vectors):
+        return _BATCH_ERROR
+    try:
+        result = [math.fsum(x for x, _ in vectors), math.fsum(y for _, y in vectors)]
+    except TypeError:
+        return _BATCH_ERROR
+    return f"Sum of vectors:\n{vector_display(result)}"
 
 @mcp.tool(description="Convert a force vector from magnitude/angle (deg) to x/y components (in N).")
 async def to_components(magnitude: float, angle_deg: float) -> str: